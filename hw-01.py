@@ -1,7 +1,18 @@
+import json
+import os
 import pickle
+import queue
+import sys
+import threading
 from abc import ABC, abstractmethod
-from collections import UserDict
-from datetime import datetime, timedelta
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from functools import wraps
+
+
+def _fmt_date(d):
+    """Formats a date as DD.MM.YYYY without going through strftime."""
+    return f"{d.day:02d}.{d.month:02d}.{d.year:04d}"
 
 
 class BaseView(ABC):
@@ -15,8 +26,8 @@ class BaseView(ABC):
 
 
     @abstractmethod
-    def display_commands(self, commands):
-        """Method for displaying a list of available commands"""
+    def display_commands(self, commands_text):
+        """Method for displaying the prepared list of available commands"""
         pass
 
 
@@ -42,24 +53,33 @@ class ConsoleView(BaseView):
     """Implementing an interface for the console"""
 
 
+    def __init__(self, commands=None):
+        """Builds the command completion once if prompt_toolkit is available"""
+        self._session = None
+        if commands and sys.stdin.isatty():
+            try:
+                from prompt_toolkit import PromptSession
+                from prompt_toolkit.completion import WordCompleter
+            except ImportError:
+                return
+            words = [word for command in commands for word in command.split("/")]
+            self._session = PromptSession(completer=WordCompleter(words, ignore_case=True))
+
+
     def display_contacts(self, contacts):
         """Prints the contact list to the console"""
         if not contacts:
             print("No contacts saved.")
         else:
-            print("Contacts: ")
-            for record in contacts:
-                phone = "; ".join(p.value for p in record.phones)
-                birthday = f", birthday: {record.birthday.value.strftime('%d.%m.%Y')}" if record.birthday else ""
-                print(f"Name: {record.name.value}, phone: {phone}{birthday}")
+            lines = ["Contacts: "]
+            lines.extend(str(record) for record in contacts)
+            sys.stdout.write("\n".join(lines) + "\n")
 
 
 
-    def display_commands(self, commands):
-        """Prints a list of available commands to the console"""
-        print("\nCommands:")
-        for command, desciption in commands.items():
-            print(f"{command}: {desciption}")
+    def display_commands(self, commands_text):
+        """Prints the prepared list of available commands to the console"""
+        sys.stdout.write(commands_text)
 
 
 
@@ -71,73 +91,135 @@ class ConsoleView(BaseView):
 
     def display_notes(self, notes):
         """Prints a list of notes to the console."""
-        print("Notes:")
+        lines = ["Notes:"]
         if not notes:
-            print("No notes saved.")
+            lines.append("No notes saved.")
         else:
-            for note in notes:
-                print(note)
+            lines.extend(str(note) for note in notes)
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 
     def get_input(self, entry):
         """Receives user input from the console"""
+        if self._session is not None:
+            return self._session.prompt(entry)
         return input(entry)
         
 
 class Field:
     """Base class for record fields."""
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
+    def __getstate__(self):
+        return {"value": self.value}
+
+    def __setstate__(self, state):
+        self.value = state["value"]
+
     def __str__(self):
         return str(self.value)
 
 
 class Name(Field):
     """Class for storing the contact name."""
+    __slots__ = ()
+
     def __init__(self, value):
         if not value:
             raise ValueError("Name cannot be empty.")
-        super().__init__(value)
+        # Interned so the book key and the record share one string
+        super().__init__(sys.intern(value))
+
+    def __setstate__(self, state):
+        self.value = sys.intern(state["value"])
 
 
 class Phone(Field):
     """A class for storing a phone number."""
+    __slots__ = ()
+
     def __init__(self, value):
-        if not value.isdigit() or len(value) != 10:
+        # isascii keeps out non-ASCII digits such as "٠" that isdigit accepts
+        if len(value) != 10 or not (value.isascii() and value.isdigit()):
             raise ValueError("Phone must contain exactly 10 digits")
         super().__init__(value)
 
 
 class Birthday(Field):
     """A class for storing birthdays."""
+    __slots__ = ("month", "day", "md_key")
+
     def __init__(self, value):
         try:
-            self.value = datetime.strptime(value, "%d.%m.%Y").date()
+            day, month, year = value.split(".")
+            digits = day + month + year
+            if len(day) > 2 or len(month) > 2 or len(year) != 4 or not (digits.isascii() and digits.isdigit()):
+                raise ValueError
+            self.value = date(int(year), int(month), int(day))
         except ValueError:
             raise ValueError("Birthday must be in the format DD.MM.YYYY.")
+        self._cache_key()
+
+
+    def __setstate__(self, state):
+        """Restores a birthday and recomputes its cached key."""
+        super().__setstate__(state)
+        self._cache_key()
+
+
+    def _cache_key(self):
+        """Caches the month and day as a MMDD integer for fast comparison."""
+        self.month = self.value.month
+        self.day = self.value.day
+        self.md_key = self.month * 100 + self.day
 
 
 class Record:
     """Class for storing contact information."""
+    __slots__ = ("name", "phones", "birthday", "_phones_by_value", "_phones_str_cache")
+
     def __init__(self, name):
         self.name = Name(name)
         self.phones = []
         self.birthday = None
+        self._phones_by_value = {}
+        self._phones_str_cache = None
+
+
+    def __getstate__(self):
+        """Leaves derived attributes out of the pickle."""
+        return {"name": self.name, "phones": self.phones, "birthday": self.birthday}
+
+
+    def __setstate__(self, state):
+        """Restores a record and rebuilds the phone index."""
+        self.name = state["name"]
+        self.phones = state["phones"]
+        self.birthday = state["birthday"]
+        self._phones_by_value = {p.value: p for p in self.phones}
+        self._phones_str_cache = None
 
 
     def add_phone(self, phone):
         """Adds a phone number to a contact."""
-        if phone not in [p.value for p in self.phones]:
-            self.phones.append(Phone(phone))
+        if phone in self._phones_by_value:
+            return
+        phone_obj = Phone(phone)
+        self.phones.append(phone_obj)
+        self._phones_by_value[phone] = phone_obj
+        self._phones_str_cache = None
 
 
     def remove_phone(self, phone):
         """Deletes a phone number from the entry."""
-        phone_obj = self.find_phone(phone)
+        phone_obj = self._phones_by_value.pop(phone, None)
         if phone_obj:
             self.phones.remove(phone_obj)
+            self._phones_str_cache = None
         else:
             raise ValueError('Phone not found')
         
@@ -146,17 +228,31 @@ class Record:
         """Edits the phone number."""
         phone_obj = self.find_phone(old_phone)
         if phone_obj:
-            phone_obj.value = Phone(new_phone).value
+            new_value = Phone(new_phone).value
+            if new_value == old_phone:
+                return
+            del self._phones_by_value[old_phone]
+            if new_value in self._phones_by_value:
+                # The new number is already on the record, so merge the two
+                self.phones.remove(phone_obj)
+            else:
+                phone_obj.value = new_value
+                self._phones_by_value[new_value] = phone_obj
+            self._phones_str_cache = None
         else:
             raise ValueError("Old phone not found")
 
 
     def find_phone(self, phone):
         """Searches for a phone number in a record."""
-        for p in self.phones:
-            if p.value == phone:
-                return p
-        return None
+        return self._phones_by_value.get(phone)
+
+
+    def phones_str(self):
+        """Returns the phone numbers joined with "; ", cached until they change."""
+        if self._phones_str_cache is None:
+            self._phones_str_cache = "; ".join(p.value for p in self.phones)
+        return self._phones_str_cache
 
 
     def add_birthday(self, birthday):
@@ -165,70 +261,358 @@ class Record:
 
 
     def __str__(self):
-        phone = "; ".join(p.value for p in self.phones)
-        birthday = f", birthday: {self.birthday.value.strftime('%d.%m.%Y')}" if self.birthday else ""
-        return f"Name: {self.name.value}, phone: {phone}{birthday}"
+        birthday = f", birthday: {_fmt_date(self.birthday.value)}" if self.birthday else ""
+        return f"Name: {self.name.value}, phone: {self.phones_str()}{birthday}"
 
 
-class AddressBook(UserDict):
+class AddressBook(dict):
     """A class for storing and managing records."""
+    def __init__(self, *args, **kwargs):
+        # Sequence number of the last logged change applied to the book
+        self.log_seq = 0
+        # Bumped whenever a change can affect upcoming birthdays
+        self._version = 0
+        self._bdays_cache = None
+        super().__init__(*args, **kwargs)
+        self._reindex()
+
+
+    def __getstate__(self):
+        """Leaves the birthday cache and index out of the pickle."""
+        return {"log_seq": self.log_seq}
+
+
+    def __setstate__(self, state):
+        """Restores the book and rebuilds its birthday index."""
+        # Books saved before AddressBook became a dict keep records in "data"
+        records = list(state.get("data", self).values())
+        # Re-key by the interned record names so keys and names share strings
+        self.clear()
+        for record in records:
+            self[record.name.value] = record
+        self.log_seq = state.get("log_seq", 0)
+        self._version = 0
+        self._bdays_cache = None
+        self._reindex()
+
+
+    def _reindex(self):
+        """Rebuilds the birthday index from the records."""
+        # Maps names to birthdays, plus (MMDD key, name) pairs sorted by key
+        self._birthdays = {}
+        for name, record in self.items():
+            if record.birthday:
+                self._birthdays[name] = record.birthday
+        self._bday_sorted = sorted((birthday.md_key, name) for name, birthday in self._birthdays.items())
+
+
+    def _index_birthday(self, name, birthday):
+        """Adds or replaces a birthday in the birthday index."""
+        self._unindex_birthday(name)
+        self._birthdays[name] = birthday
+        insort(self._bday_sorted, (birthday.md_key, name))
+
+
+    def _unindex_birthday(self, name):
+        """Removes a name from the birthday index."""
+        birthday = self._birthdays.pop(name, None)
+        if birthday is not None:
+            del self._bday_sorted[bisect_left(self._bday_sorted, (birthday.md_key, name))]
+
+
+    def set_birthday(self, name, birthday):
+        """Sets a contact's birthday and updates the birthday index."""
+        record = self.find(name)
+        if record is None:
+            raise ValueError("Contact not found")
+        record.add_birthday(birthday)
+        self._index_birthday(name, record.birthday)
+        self._version += 1
 
 
     def add_record(self, record):
-        self.data[record.name.value] = record
+        name = record.name.value
+        if name in self:
+            self._unindex_birthday(name)
+        self[name] = record
+        if record.birthday:
+            self._index_birthday(name, record.birthday)
+        self._version += 1
 
 
     def find(self, name):
-        return self.data.get(name)
+        return self.get(name)
 
 
     def delete(self, name):
-        if name in self.data:
-            del self.data[name]
+        if name in self:
+            del self[name]
+            self._unindex_birthday(name)
+            self._version += 1
         else:
             raise ValueError("Contact not found")
 
 
     def get_upcoming_birthdays(self, days=7):
         """Returns a list of upcoming birthdays."""
-        upcoming_birthdays = []
-        today = datetime.today().date()
+        today = date.today()
+        if self._bdays_cache is not None:
+            cached_today, cached_version, cached_days, cached_birthdays = self._bdays_cache
+            if (cached_today, cached_version, cached_days) == (today, self._version, days):
+                return list(cached_birthdays)
 
-        for record in self.data.values():
-            if record.birthday:
-                birthday_this_year = record.birthday.value.replace(year=today.year)
-                if birthday_this_year < today:
-                    birthday_this_year = birthday_this_year.replace(year=today.year + 1)
-                days_until_birthday = (birthday_this_year - today).days
-                if 0 <= days_until_birthday <= days:
-                    if birthday_this_year.weekday() >= 5:
-                        birthday_this_year += timedelta(days=(7 - birthday_this_year.weekday()))
-                    upcoming_birthdays.append(f"Name: {record.name.value}, birthday: {birthday_this_year.strftime('%d.%m.%Y')}")
-
-        return upcoming_birthdays
+        upcoming_birthdays = []
+        last_day = today + timedelta(days=days)
+        today_key = today.month * 100 + today.day
+        last_key = last_day.month * 100 + last_day.day
+        if last_day.year > today.year + 1:
+            # The window covers every day of the year
+            last_key = 1231
+        if last_day.year > today.year:
+            # The window runs past the end of the year
+            key_ranges = ((today_key, 1231), (101, min(last_key, today_key - 1)))
+        else:
+            key_ranges = ((today_key, last_key),)
+
+        for first_key, end_key in key_ranges:
+            # Names are never empty, so (key, "") sorts before every entry with that key
+            start = bisect_left(self._bday_sorted, (first_key, ""))
+            stop = bisect_left(self._bday_sorted, (end_key + 1, ""))
+            for key, name in self._bday_sorted[start:stop]:
+                birthday = self._birthdays[name]
+                year = today.year if key >= today_key else today.year + 1
+                birthday_this_year = date(year, birthday.month, birthday.day)
+                if birthday_this_year.weekday() >= 5:
+                    birthday_this_year += timedelta(days=(7 - birthday_this_year.weekday()))
+                upcoming_birthdays.append(f"Name: {name}, birthday: {_fmt_date(birthday_this_year)}")
+
+        self._bdays_cache = (today, self._version, days, upcoming_birthdays)
+        return list(upcoming_birthdays)
     
 
     def __str__(self):
-        return "\n".join(str(record) for record in self.data.values())
+        return "\n".join(str(record) for record in self.values())
+
+
+# Number of logged changes after which a full snapshot is saved.
+SAVE_EVERY = 100
+
+# Changes appended to the log since the last snapshot was queued.
+_unsaved_ops = 0
+
+# Number of log appends between fsyncs of the log.
+SYNC_EVERY = 10
+
+# Changes appended to the log since it was last synced to disk.
+_unsynced_ops = 0
+
+# Holds at most one pending snapshot for the background writer. Both are
+# created on the first save.
+_save_queue = None
+_writer = None
+
+# Log sequence number covered by the last snapshot the writer saved. Only
+# the main thread rewrites the log, using this to drop changes up to it.
+_saved_seq = None
+
+# The last error the writer hit, re-raised by flush_data.
+_save_error = None
+
+
+def _write_snapshots():
+    """Writes queued snapshots to disk until it receives None."""
+    global _saved_seq, _save_error
+    while True:
+        item = _save_queue.get()
+        if item is None:
+            break
+        data, filename, seq = item
+        tmp_filename = filename + ".tmp"
+        try:
+            with open(tmp_filename, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_filename, filename)
+        except OSError as e:
+            _save_error = e
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
+            continue
+        _saved_seq = seq
+        # A later successful save supersedes an earlier failure
+        _save_error = None
+
+
+def _compact_log(filename):
+    """Drops changes that are already in a saved snapshot from the log."""
+    global _saved_seq, _unsynced_ops
+    saved_seq, _saved_seq = _saved_seq, None
+    if saved_seq is None:
+        return
+    try:
+        with open(filename, encoding="utf-8") as f:
+            lines = [line for line in f if json.loads(line)["seq"] > saved_seq]
+    except FileNotFoundError:
+        return
+    except ValueError:
+        # A torn last line; load_data trims it, so keep the log for now
+        return
+    if not lines:
+        os.remove(filename)
+        return
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
+    _unsynced_ops = 0
+
+
+def append_op(book, op, filename="addressbook.log"):
+    """Appends a change to the log, which is replayed on the next load.
+
+    Call it before applying the change, so a failed write leaves the book
+    untouched. A logged change that then fails is skipped on replay.
+    """
+    global _unsaved_ops, _unsynced_ops
+    _compact_log(filename)
+    seq = book.log_seq + 1
+    with open(filename, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"seq": seq, **op}) + "\n")
+        _unsynced_ops += 1
+        if _unsynced_ops >= SYNC_EVERY:
+            f.flush()
+            os.fsync(f.fileno())
+            _unsynced_ops = 0
+    book.log_seq = seq
+    _unsaved_ops += 1
+
+
+def _sync_log(filename):
+    """Syncs changes appended to the log since the last fsync to disk."""
+    global _unsynced_ops
+    if not _unsynced_ops:
+        return
+    try:
+        with open(filename, "r+b") as f:
+            os.fsync(f.fileno())
+    except FileNotFoundError:
+        pass
+    _unsynced_ops = 0
 
 
 def save_data(book, filename="addressbook.pkl"):
-    """Saves data to a file."""
-    with open(filename, "wb") as f:
-        pickle.dump(book, f)
+    """Saves a full snapshot to a file in the background."""
+    global _unsaved_ops, _save_queue, _writer
+    if _writer is None:
+        _save_queue = queue.Queue(maxsize=1)
+        _writer = threading.Thread(target=_write_snapshots, daemon=True)
+        _writer.start()
+    # Pickling here keeps the snapshot consistent with the current state
+    item = (pickle.dumps(book, protocol=pickle.HIGHEST_PROTOCOL), filename, book.log_seq)
+    while True:
+        try:
+            _save_queue.put_nowait(item)
+            break
+        except queue.Full:
+            # Replace a snapshot the writer hasn't picked up yet
+            try:
+                _save_queue.get_nowait()
+            except queue.Empty:
+                pass
+    _unsaved_ops = 0
+
+
+def flush_data(log_filename="addressbook.log"):
+    """Waits until pending snapshots are written, then compacts and syncs the log.
+
+    Raises the last OSError the writer hit since the previous flush.
+    """
+    global _writer, _save_error
+    if _writer is not None:
+        _save_queue.put(None)
+        _writer.join()
+        _writer = None
+    _compact_log(log_filename)
+    _sync_log(log_filename)
+    if _save_error is not None:
+        error, _save_error = _save_error, None
+        raise error
+
+
+def _apply_op(book, op):
+    """Applies a logged change to the address book.
+
+    Raises ValueError if the change no longer applies to the book.
+    """
+    name = op["name"]
+    if op["op"] == "add":
+        record = book.find(name)
+        if record is None:
+            record = Record(name)
+            record.add_phone(op["phone"])
+            book.add_record(record)
+        else:
+            record.add_phone(op["phone"])
+        return
+    if op["op"] == "delete":
+        book.delete(name)
+        return
+    record = book.find(name)
+    if record is None:
+        raise ValueError("Contact not found")
+    if op["op"] == "change":
+        record.edit_phone(op["old_phone"], op["new_phone"])
+    elif op["op"] == "add-birthday":
+        book.set_birthday(name, op["birthday"])
 
 
-def load_data(filename="addressbook.pkl"):
-    """Loads data from a file."""
+def load_data(filename="addressbook.pkl", log_filename="addressbook.log"):
+    """Loads data from a file and replays the changes logged after it."""
     try:
         with open(filename, "rb") as f:
-            return pickle.load(f)
+            book = pickle.load(f)
     except (FileNotFoundError, EOFError):
-        return AddressBook()
+        book = AddressBook()
+    torn_at = None
+    try:
+        with open(log_filename, "rb") as f:
+            end = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    op = json.loads(line)
+                except ValueError:
+                    torn_at = end
+                    break
+                end += len(line)
+                if op["seq"] <= book.log_seq:
+                    continue
+                try:
+                    _apply_op(book, op)
+                except (KeyError, ValueError):
+                    # The snapshot this change was logged against is gone
+                    # or older; skip the change rather than refuse to start
+                    pass
+                book.log_seq = op["seq"]
+    except FileNotFoundError:
+        pass
+    if torn_at is not None:
+        # The last line was cut off mid-write; drop it so new changes
+        # aren't appended to it
+        with open(log_filename, "r+b") as f:
+            f.truncate(torn_at)
+    return book
 
 
 def input_error(func):
-    """Decorator to handle input errors and exceptions."""
+    """Decorator to handle input errors."""
+    @wraps(func)
     def inner(*args, **kwargs):
         try:
             return func(*args, **kwargs)
@@ -237,9 +621,9 @@ def input_error(func):
         except KeyError:
             return "Contact not found."
         except ValueError as e:
-            return str(e)
-        except Exception as e:
-            return f"An error occurred: {str(e)}"
+            return str(e) or "Invalid value."
+        except OSError as e:
+            return f"Could not save the change: {e}"
 
     return inner
 
@@ -251,14 +635,17 @@ def add_contact(args, book):
         return "Usage: add <name> <phone>"
     name, phone = args[0], args[1]
     record = book.find(name)
+    # Validate before logging so the log only holds changes that apply
+    Phone(phone)
+    append_op(book, {"op": "add", "name": name, "phone": phone})
     if record is None:
         record = Record(name)
+        record.add_phone(phone)
         book.add_record(record)
         message = "Contact saved."
     else:
+        record.add_phone(phone)
         message = "Contact updated."
-    record.add_phone(phone)
-    save_data(book)
     return message
 
 
@@ -270,8 +657,11 @@ def change_contact(args, book):
     name, old_phone, new_phone = args
     record = book.find(name)
     if record:
+        if record.find_phone(old_phone) is None:
+            raise ValueError("Old phone not found")
+        Phone(new_phone)
+        append_op(book, {"op": "change", "name": name, "old_phone": old_phone, "new_phone": new_phone})
         record.edit_phone(old_phone, new_phone)
-        save_data(book)
         return "Contact updated."
     return "Contact not found."
 
@@ -284,7 +674,7 @@ def show_phone(args, book: AddressBook):
     name = args[0]
     record = book.find(name)
     if record:
-        return f"The phone number for {name} is {', '.join([p.value for p in record.phones])}."
+        return f"The phone number for {name} is {', '.join(p.value for p in record.phones)}."
     return "Contact not found."
 
 
@@ -297,8 +687,9 @@ def add_birthday(args, book):
     record = book.find(name)
     if record is None:
         return "Contact not found."
-    record.add_birthday(birthday)
-    save_data(book)
+    Birthday(birthday)
+    append_op(book, {"op": "add-birthday", "name": name, "birthday": birthday})
+    book.set_birthday(name, birthday)
     return "Birthday added."
 
 
@@ -313,7 +704,20 @@ def show_birthday(args, book):
         return "Contact not found."
     if not record.birthday:
         return f"{name} has no birthday set."
-    return f"{name}'s birthday is {record.birthday.value.strftime('%d.%m.%Y')}."
+    return f"{name}'s birthday is {_fmt_date(record.birthday.value)}."
+
+
+@input_error
+def delete_contact(args, book):
+    """Deletes the specified contact."""
+    if not args:
+        return "Usage: delete <name>"
+    name = args[0]
+    if book.find(name) is None:
+        return "Contact not found"
+    append_op(book, {"op": "delete", "name": name})
+    book.delete(name)
+    return "Contact deleted."
 
 
 @input_error
@@ -325,8 +729,6 @@ def birthday(_, book):
 
 def main():
     book = load_data()
-    # Створюємо екземпляр ConsoleView
-    cv = ConsoleView()
 
     commands = {
             "hello": "Показати привітання",
@@ -342,46 +744,57 @@ def main():
             "exit/close": "Вийти з програми\n"
         }
 
+    # Текст довідки не змінюється, тому будуємо його один раз
+    commands_text = "\nCommands:\n" + "".join(f"{command}: {description}\n" for command, description in commands.items())
+
+    # Створюємо екземпляр ConsoleView
+    cv = ConsoleView(commands)
+
     cv.display_message("Welcome to the assistant bot!\n")    
-    cv.display_contacts(book.data.values())
-    cv.display_commands(commands)
+    cv.display_contacts(book.values())
+    cv.display_commands(commands_text)
+
+    handlers = {
+            "hello": lambda args: cv.display_message("Hello! How can I help you?"),
+            "add": lambda args: cv.display_message(add_contact(args, book)),
+            "change": lambda args: cv.display_message(change_contact(args, book)),
+            "delete": lambda args: cv.display_message(delete_contact(args, book)),
+            "phone": lambda args: cv.display_message(show_phone(args, book)),
+            "all": lambda args: cv.display_contacts(book.values()),
+            "add-birthday": lambda args: cv.display_message(add_birthday(args, book)),
+            "show-birthday": lambda args: cv.display_message(show_birthday(args, book)),
+            "birthdays": lambda args: cv.display_message(birthday(args, book)),
+            "commands": lambda args: cv.display_commands(commands_text),
+        }
 
     while True:
-        command_input = cv.get_input("Enter a command: ").strip().lower()
-        command_parts = command_input.split()
-        if not command_parts:
+        if _unsaved_ops >= SAVE_EVERY:
+            save_data(book)
+
+        try:
+            command_input = cv.get_input("Enter a command: ").strip()
+        except (EOFError, KeyboardInterrupt):
+            # Ctrl-D, Ctrl-C or the end of piped input exits like "exit"
+            cv.display_message("")
+            command_input = "exit"
+        if not command_input:
             continue
-        command, args = command_parts[0], command_parts[1:]
+        # Only the command is case-insensitive; names keep their case
+        command_parts = command_input.split(maxsplit=4)
+        command, args = command_parts[0].lower(), command_parts[1:]
 
         if command in ["close", "exit"]:
             save_data(book)
+            try:
+                flush_data()
+            except OSError as e:
+                cv.display_message(f"Could not save the address book: {e}")
             cv.display_message("Good bye!")
             break
-        elif command == "hello":
-            cv.display_message("Hello! How can I help you?")
-        elif command == "add":
-            cv.display_message(add_contact(args, book))
-        elif command == "change":
-            cv.display_message(change_contact(args, book))
-        elif command == "delete" and args:
-            try:
-                book.delete(args[0])
-                save_data(book)
-                cv.display_message("Contact deleted.")
-            except ValueError as e:
-                cv.display_message(str(e))
-        elif command == "phone":
-            cv.display_message(show_phone(args, book))
-        elif command == "all":
-            cv.display_contacts(book.data.values())
-        elif command == "add-birthday":
-            cv.display_message(add_birthday(args, book))
-        elif command == "show-birthday":
-            cv.display_message(show_birthday(args, book))
-        elif command == "birthdays":
-            cv.display_message(birthday([], book))
-        elif command == "commands":
-            cv.display_commands(commands)
+
+        handler = handlers.get(command)
+        if handler:
+            handler(args)
         else:
             cv.display_message("Invalid command.")
 